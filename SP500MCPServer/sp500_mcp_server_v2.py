@@ -9,15 +9,21 @@ All optional parameters use empty strings/defaults instead of Optional types.
 """
 
 import argparse
+import asyncio
 import csv
-import json
+import functools
 import logging
+import operator
 import os
+import pickle
+import sys
+import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Annotated, Any, Dict, List
+from typing import Annotated, Any, Dict, List, NamedTuple, Tuple
 
+import numpy as np
 from fastmcp import Context, FastMCP
 
 # Configure structured logging
@@ -31,51 +37,388 @@ logger = logging.getLogger(__name__)
 # Configuration
 SERVER_NAME = os.environ.get("MCP_FASTMCP_SERVER_NAME", "sp500-portfolio-analysis-v2")
 PORTFOLIO_CSV_PATH = Path(__file__).parent / "sp500_style_portfolio_60.csv"
+PORTFOLIO_CACHE_PATH = PORTFOLIO_CSV_PATH.with_suffix(".pkl")
+PORTFOLIO_CACHE_VERSION = 3
+USE_UVLOOP = os.environ.get("SP500_MCP_UVLOOP", "1") != "0"
 
 server = FastMCP(SERVER_NAME)
 
-# Cache for portfolio data
-_portfolio_cache: List[Dict[str, Any]] = []
 
+class Company(NamedTuple):
+    """One portfolio holding, with fields in CSV column order."""
+    ticker: str
+    company_name: str
+    sector: str
+    industry: str
+    investment_usd: float
+    revenue_usd: float
+    cogs_usd: float
+    gross_margin_pct: float
+    fiscal_year: float
+    imports_into_us: bool
+    affected_cogs_pct: float
+    exposure_level: str
+    confidence: float
+    data_source: str
+
+
+# Cache for portfolio data: Company rows (for JSON output) plus a column store (for filtering)
+_portfolio_rows: List[Company] = []
+_portfolio_cols: Dict[str, np.ndarray] = {}
+_portfolio_lock = threading.Lock()
+
+# Reverse indexes built at load time: lowercased value -> row positions, uppercased ticker -> row position
+_by_sector: Dict[str, List[int]] = {}
+_by_industry: Dict[str, List[int]] = {}
+_by_exposure: Dict[str, List[int]] = {}
+_by_ticker: Dict[str, int] = {}
+
+# Row bitmaps for intersecting filters: column -> value -> uint64 words (bit i set = row i matches)
+_bitmaps: Dict[str, Dict[str, np.ndarray]] = {}
+
+# Display name for each sector code
+_sector_names: List[str] = []
+
+# CSV columns and the types they are parsed into; anything else stays a string column
+NUMERIC_COLUMNS = [
+    'investment_usd', 'revenue_usd', 'cogs_usd',
+    'gross_margin_pct', 'fiscal_year', 'affected_cogs_pct', 'confidence'
+]
+BOOLEAN_COLUMNS = ['imports_into_us']
+TEXT_COLUMNS = ['ticker', 'company_name', 'sector', 'industry', 'exposure_level', 'data_source']
+
+# Low-cardinality text columns stored as small integer codes (<name>_code) for filtering and grouping
+CATEGORICAL_COLUMNS = ['sector', 'industry', 'exposure_level']
+
+# Numeric columns query_sp500_portfolio accepts as sort_by
+SORT_FIELDS = frozenset(['revenue_usd', 'affected_cogs_pct', 'confidence', 'investment_usd'])
+
+
+def _parse_float_column(values: tuple) -> np.ndarray:
+    """Convert a column of CSV strings to float64, mapping unparseable cells to 0.0."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(float(value))
+            except ValueError:
+                parsed.append(0.0)
+        return np.asarray(parsed, dtype=np.float64)
+
+
+def _read_portfolio_csv() -> Dict[str, np.ndarray]:
+    """Parse the portfolio CSV into typed NumPy columns keyed by header name."""
+    with open(PORTFOLIO_CSV_PATH, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        fields = list(zip(*reader)) or [()] * len(header)
+
+    columns: Dict[str, np.ndarray] = {}
+    for name, values in zip(header, fields):
+        if name in NUMERIC_COLUMNS:
+            columns[name] = _parse_float_column(values)
+        elif name in BOOLEAN_COLUMNS:
+            columns[name] = np.char.upper(np.asarray(values, dtype=str)) == 'TRUE'
+        elif name in CATEGORICAL_COLUMNS:
+            # Interned so every row shares one string object per category
+            columns[name] = np.asarray([sys.intern(value) for value in values], dtype=object)
+        else:
+            columns[name] = np.asarray(values, dtype=object)
+
+    return columns
+
+
+def _load_portfolio_columns() -> Dict[str, np.ndarray]:
+    """Load typed columns from the on-disk cache, re-parsing the CSV when the cache is stale."""
+    if PORTFOLIO_CACHE_PATH.exists() and PORTFOLIO_CACHE_PATH.stat().st_mtime >= PORTFOLIO_CSV_PATH.stat().st_mtime:
+        try:
+            cached = pickle.loads(PORTFOLIO_CACHE_PATH.read_bytes())
+            if cached.get('version') == PORTFOLIO_CACHE_VERSION:
+                logger.info(f"📦 Using cached portfolio columns from {PORTFOLIO_CACHE_PATH.name}")
+                return cached['columns']
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable portfolio cache {PORTFOLIO_CACHE_PATH}: {type(e).__name__}: {str(e)}")
+
+    columns = _read_portfolio_csv()
+
+    # Write through a temp file so a concurrent reader never sees a partial pickle
+    payload = {'version': PORTFOLIO_CACHE_VERSION, 'columns': columns}
+    tmp_path = PORTFOLIO_CACHE_PATH.with_suffix(".pkl.tmp")
+    try:
+        tmp_path.write_bytes(pickle.dumps(payload, protocol=5))
+        os.replace(tmp_path, PORTFOLIO_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write portfolio cache {PORTFOLIO_CACHE_PATH}: {str(e)}")
+
+    return columns
+
+
+def _build_columns(columns: Dict[str, np.ndarray], size: int) -> Dict[str, np.ndarray]:
+    """Build the Struct-of-Arrays column store, filling any missing expected column."""
+    cols = dict(columns)
+    for name in NUMERIC_COLUMNS:
+        cols.setdefault(name, np.zeros(size, dtype=np.float64))
+    for name in BOOLEAN_COLUMNS:
+        cols.setdefault(name, np.zeros(size, dtype=bool))
+    for name in TEXT_COLUMNS:
+        cols.setdefault(name, np.full(size, '', dtype=object))
+
+    # Case-folded shadow columns, computed once so lookups never re-lowercase per row
+    cols['company_name_lower'] = np.asarray([value.lower() for value in cols['company_name']], dtype=str)
+    cols['ticker_upper'] = np.asarray([value.upper() for value in cols['ticker']], dtype=object)
+
+    # Derived per-company metrics, computed once for every row
+    cols['affected_cogs_usd'] = cols['cogs_usd'] * cols['affected_cogs_pct']
+    cols['revenue_to_cogs_ratio'] = np.divide(
+        cols['revenue_usd'], cols['cogs_usd'], out=np.zeros(size), where=cols['cogs_usd'] > 0
+    )
+    cols['exposure_risk_score'] = np.where(cols['imports_into_us'], cols['affected_cogs_pct'], 0.0)
+
+    return cols
+
+
+def _factorize(values: np.ndarray) -> Tuple[np.ndarray, Dict[str, List[int]]]:
+    """Assign first-seen integer codes to case-folded values, returning the codes and per-value posting lists."""
+    code_of: Dict[str, int] = {}
+    postings: Dict[str, List[int]] = {}
+    codes = np.empty(len(values), dtype=np.intp)
+    for i, value in enumerate(values):
+        key = value.lower()
+        codes[i] = code_of.setdefault(key, len(code_of))
+        postings.setdefault(key, []).append(i)
+
+    dtype = np.int8 if len(code_of) <= np.iinfo(np.int8).max else np.int32
+    return codes.astype(dtype), postings
+
+
+def _to_bitmap(positions: List[int] | np.ndarray, size: int) -> np.ndarray:
+    """Pack row positions into a bitmap of ceil(size / 64) uint64 words."""
+    bits = np.zeros(-(-size // 64) * 64, dtype=bool)
+    bits[positions] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def _bitmap_positions(bitmap: np.ndarray, size: int) -> np.ndarray:
+    """Unpack a bitmap back into ascending row positions."""
+    return np.flatnonzero(np.unpackbits(bitmap.view(np.uint8), count=size, bitorder='little'))
+
+
+def _bitmap_contains(bitmap: np.ndarray, position: int) -> bool:
+    """Test a single row's bit without unpacking the bitmap."""
+    return bool((int(bitmap[position >> 6]) >> (position & 63)) & 1)
+
+
+def _build_indexes(cols: Dict[str, np.ndarray]) -> None:
+    """Factorize the categorical columns and build the reverse indexes and bitmaps used for filters."""
+    global _by_sector, _by_industry, _by_exposure, _by_ticker, _bitmaps, _sector_names
+
+    size = len(cols['ticker'])
+    postings: Dict[str, Dict[str, List[int]]] = {}
+    for name in CATEGORICAL_COLUMNS:
+        cols[f'{name}_code'], postings[name] = _factorize(cols[name])
+
+    by_ticker: Dict[str, int] = {}
+    for i, ticker in enumerate(cols['ticker_upper']):
+        by_ticker.setdefault(ticker, i)
+
+    bitmaps = {
+        name: {value: _to_bitmap(positions, size) for value, positions in postings[name].items()}
+        for name in CATEGORICAL_COLUMNS
+    }
+    bitmaps['imports_into_us'] = {
+        'yes': _to_bitmap(np.flatnonzero(cols['imports_into_us']), size),
+        'no': _to_bitmap(np.flatnonzero(~cols['imports_into_us']), size),
+    }
+
+    _by_sector = postings['sector']
+    _by_industry = postings['industry']
+    _by_exposure = postings['exposure_level']
+    _by_ticker = by_ticker
+    _bitmaps = bitmaps
+    _sector_names = [cols['sector'][positions[0]] for positions in _by_sector.values()]
+
+
+def _sector_aggregates(positions: List[int] | None = None) -> Dict[str, np.ndarray]:
+    """Per-sector totals over the given rows (all rows if None), one np.bincount pass per metric."""
+    cols = _portfolio_cols
+    rows = slice(None) if positions is None else positions
+    ids = cols['sector_code'][rows]
+    n_sectors = len(_sector_names)
+    cogs = cols['cogs_usd'][rows]
+
+    return {
+        'company_count': np.bincount(ids, minlength=n_sectors),
+        'total_investment': np.bincount(ids, weights=cols['investment_usd'][rows], minlength=n_sectors),
+        'total_revenue': np.bincount(ids, weights=cols['revenue_usd'][rows], minlength=n_sectors),
+        'total_cogs': np.bincount(ids, weights=cogs, minlength=n_sectors),
+        'total_affected_cogs': np.bincount(ids, weights=cols['affected_cogs_usd'][rows], minlength=n_sectors),
+        'importers_count': np.bincount(ids[cols['imports_into_us'][rows]], minlength=n_sectors),
+    }
+
+
+def _top_k_positions(values: np.ndarray, k: int, positions: List[int] | None = None) -> List[int]:
+    """Row positions of the k largest values (among positions, if given), descending with ties in row order."""
+    if k <= 0:
+        return []
+
+    candidates = np.arange(len(values)) if positions is None else np.asarray(positions, dtype=np.intp)
+    scores = values[candidates]
+    if k < len(scores):
+        # O(N) partition finds the k-th largest value; only the survivors get sorted
+        threshold = np.partition(scores, -k)[-k]
+        keep = scores > threshold
+        ties = np.flatnonzero(scores == threshold)[:k - np.count_nonzero(keep)]
+        keep[ties] = True
+        candidates, scores = candidates[keep], scores[keep]
+
+    return candidates[np.argsort(-scores, kind='stable')].tolist()
+
+
+def _top_k_by_sector(k: int, positions: List[int] | None = None) -> List[List[int]]:
+    """Top-k row positions by affected_cogs_pct for every sector code, from one grouped sort."""
+    cols = _portfolio_cols
+    rows = np.arange(len(cols['sector_code'])) if positions is None else np.asarray(positions, dtype=np.intp)
+    codes = cols['sector_code'][rows]
+
+    # lexsort is stable: rows are grouped by sector, descending exposure within a group, ties in row order
+    order = rows[np.lexsort((-cols['affected_cogs_pct'][rows], codes))]
+    counts = np.bincount(codes, minlength=len(_sector_names))
+    starts = np.cumsum(counts) - counts
+    return [order[start:start + min(k, count)].tolist() for start, count in zip(starts, counts)]
+
+
+def _clear_response_caches() -> None:
+    """Drop memoized tool results computed against a previous load of the portfolio."""
+    _query_impl.cache_clear()
+    _sector_analysis_impl.cache_clear()
+    _exposure_summary_impl.cache_clear()
+    _find_company.cache_clear()
 
-def load_portfolio_data() -> List[Dict[str, Any]]:
+
+def load_portfolio_data() -> List[Company]:
     """Load and cache SP500 portfolio data from CSV."""
-    global _portfolio_cache
-    
-    if _portfolio_cache:
-        return _portfolio_cache
+    global _portfolio_rows, _portfolio_cols
     
-    if not PORTFOLIO_CSV_PATH.exists():
-        logger.error(f"Portfolio CSV not found at {PORTFOLIO_CSV_PATH}")
-        return []
+    if _portfolio_rows:
+        return _portfolio_rows
     
-    portfolio_data = []
-    with open(PORTFOLIO_CSV_PATH, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # Convert numeric fields
-            numeric_fields = [
-                'investment_usd', 'revenue_usd', 'cogs_usd', 
-                'gross_margin_pct', 'fiscal_year', 'affected_cogs_pct', 'confidence'
-            ]
-            for field in numeric_fields:
-                if field in row and row[field]:
-                    try:
-                        row[field] = float(row[field])
-                    except (ValueError, TypeError):
-                        row[field] = 0.0
-            
-            # Convert boolean fields
-            if 'imports_into_us' in row:
-                row['imports_into_us'] = row['imports_into_us'].upper() == 'TRUE'
-            
-            portfolio_data.append(row)
-    
-    _portfolio_cache = portfolio_data
+    # Serialize loads so the startup loader thread and a tool call never parse twice
+    with _portfolio_lock:
+        if _portfolio_rows:
+            return _portfolio_rows
+
+        if not PORTFOLIO_CSV_PATH.exists():
+            logger.error(f"Portfolio CSV not found at {PORTFOLIO_CSV_PATH}")
+            _portfolio_cols = _build_columns({}, 0)
+            _build_indexes(_portfolio_cols)
+            return []
+
+        columns = _load_portfolio_columns()
+        size = len(next(iter(columns.values()), ()))
+        cols = _build_columns(columns, size)
+
+        # Company rows are materialized once, from the already-typed columns, for JSON output
+        values = [cols[name].tolist() for name in Company._fields]
+        portfolio_data = [Company._make(row) for row in zip(*values)]
+
+        # Publish the rows last: a non-empty _portfolio_rows means columns and indexes are ready
+        _portfolio_cols = cols
+        _build_indexes(_portfolio_cols)
+        _clear_response_caches()
+        _portfolio_rows = portfolio_data
+
+        # The exposure summary takes no arguments, so build it here rather than on the first request
+        _exposure_summary_impl()
+
     logger.info(f"✅ Loaded {len(portfolio_data)} companies from SP500 portfolio CSV")
     return portfolio_data
 
 
+async def _ensure_portfolio_loaded() -> List[Company]:
+    """Return the portfolio rows, waiting off the event loop if the startup load has not finished."""
+    if _portfolio_rows:
+        return _portfolio_rows
+    return await asyncio.to_thread(load_portfolio_data)
+
+
+def _plan_filters(sector: str, industry: str, exposure_level: str, imports_filter: str, ticker: str) -> np.ndarray:
+    """Resolve the equality and import filters to ascending candidate row positions."""
+    size = len(_portfolio_rows)
+    imports_l = imports_filter.lower()
+    filters = [
+        ('sector', sector.lower()),
+        ('industry', industry.lower()),
+        ('exposure_level', exposure_level.lower()),
+        ('imports_into_us', imports_l if imports_l in ('yes', 'no') else ''),
+    ]
+    empty = np.zeros(-(-size // 64), dtype=np.uint64)
+    selected = [_bitmaps[name].get(value, empty) for name, value in filters if value]
+
+    # A ticker pins at most one row, so test that row's bit in each filter instead of unpacking anything
+    if ticker:
+        idx = _by_ticker.get(ticker.upper())
+        if idx is None or not all(_bitmap_contains(bitmap, idx) for bitmap in selected):
+            return np.zeros(0, dtype=np.intp)
+        return np.array([idx], dtype=np.intp)
+
+    if not selected:
+        return np.arange(size)
+
+    # Intersect with a word-wise AND, then unpack once
+    return _bitmap_positions(np.bitwise_and.reduce(selected), size)
+
+
+@functools.lru_cache(maxsize=256)
+def _query_impl(
+    sector: str,
+    industry: str,
+    exposure_level: str,
+    imports_filter: str,
+    min_revenue: float,
+    max_revenue: float,
+    min_affected_cogs_pct: float,
+    company_name: str,
+    ticker: str,
+    limit: int,
+    sort_by: str,
+    sort_desc: bool,
+) -> Tuple[int, Tuple[int, ...]]:
+    """Filter and sort the portfolio, returning the match count and the row positions to return."""
+    cols = _portfolio_cols
+    candidates = _plan_filters(sector, industry, exposure_level, imports_filter, ticker)
+
+    # Remaining filters (only if not empty/zero) are evaluated over the candidate rows only
+    keep = np.ones(len(candidates), dtype=bool)
+    if min_revenue > 0 or max_revenue > 0:
+        revenue = cols['revenue_usd'][candidates]
+        if min_revenue > 0:
+            keep &= revenue >= min_revenue
+        if max_revenue > 0:
+            keep &= revenue <= max_revenue
+
+    if min_affected_cogs_pct > 0:
+        keep &= cols['affected_cogs_pct'][candidates] >= min_affected_cogs_pct
+
+    if company_name:
+        needle = company_name.lower()
+        keep &= np.char.find(cols['company_name_lower'][candidates], needle) >= 0
+
+    matches = candidates[keep]
+
+    # Sort results as positions, ranking by keys where larger comes first
+    if sort_by in SORT_FIELDS:
+        keys = cols[sort_by] if sort_desc else -cols[sort_by]
+        if 0 <= limit < len(matches):
+            # Only the returned rows need ordering: partial selection instead of a full sort
+            return len(matches), tuple(_top_k_positions(keys, limit, matches))
+        matches = matches[np.argsort(-keys[matches], kind='stable')]
+
+    # Limit results, materializing a single Python sequence
+    return len(matches), tuple(matches[:limit].tolist())
+
+
 @server.tool(
     name="query_sp500_portfolio",
     title="Query SP500 Portfolio",
@@ -91,6 +434,10 @@ def load_portfolio_data() -> List[Dict[str, Any]]:
     
     Returns matching companies with all their data fields.
     All filter parameters are optional - use empty strings to skip filtering.
+
+    By default "companies" is a list of objects (response_format='records').
+    With response_format='columnar', "companies" is {"columns": [field names],
+    "rows": [[values in column order], ...]}, a smaller payload for large result sets.
     """
 )
 async def query_sp500_portfolio(
@@ -106,6 +453,7 @@ async def query_sp500_portfolio(
     limit: Annotated[int, "Maximum number of results to return"] = 20,
     sort_by: Annotated[str, "Sort results by field: 'revenue_usd', 'affected_cogs_pct', 'confidence', 'investment_usd'. Use empty string for default."] = "",
     sort_desc: Annotated[bool, "Sort in descending order"] = True,
+    response_format: Annotated[str, "Layout of 'companies': 'records' (list of objects) or 'columnar' (column names plus row arrays)."] = "records",
     ctx: Context | None = None,
 ) -> Dict[str, Any]:
     """
@@ -119,48 +467,29 @@ async def query_sp500_portfolio(
     logger.info(f"   └─ Filters: sector={sector}, industry={industry}, exposure={exposure_level}, limit={limit}")
     
     try:
-        data = load_portfolio_data()
-        results = data.copy()
-        
-        # Apply filters (only if not empty/zero)
-        if sector:
-            results = [c for c in results if c.get('sector', '').lower() == sector.lower()]
-        
-        if industry:
-            results = [c for c in results if c.get('industry', '').lower() == industry.lower()]
-        
-        if exposure_level:
-            results = [c for c in results if c.get('exposure_level', '').lower() == exposure_level.lower()]
-        
-        if imports_filter:
-            if imports_filter.lower() == 'yes':
-                results = [c for c in results if c.get('imports_into_us')]
-            elif imports_filter.lower() == 'no':
-                results = [c for c in results if not c.get('imports_into_us')]
-        
-        if min_revenue > 0:
-            results = [c for c in results if float(c.get('revenue_usd', 0)) >= min_revenue]
-
-        if max_revenue > 0:
-            results = [c for c in results if float(c.get('revenue_usd', 0)) <= max_revenue]
-
-        if min_affected_cogs_pct > 0:
-            results = [c for c in results if float(c.get('affected_cogs_pct', 0)) >= min_affected_cogs_pct]
-
-        if company_name:
-            results = [c for c in results if company_name.lower() in c.get('company_name', '').lower()]
-
-        if ticker:
-            results = [c for c in results if c.get('ticker', '').upper() == ticker.upper()]
-
-        total_matches = len(results)
+        if response_format not in ('records', 'columnar'):
+            return {
+                "request_id": f"rq_{request_id}",
+                "status": "error",
+                "error": "response_format must be 'records' or 'columnar'",
+                "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+            }
 
-        # Sort results
-        if sort_by and sort_by in ['revenue_usd', 'affected_cogs_pct', 'confidence', 'investment_usd']:
-            results = sorted(results, key=lambda x: float(x.get(sort_by, 0)), reverse=sort_desc)
+        data = await _ensure_portfolio_loaded()
+        total_matches, positions = _query_impl(
+            sector, industry, exposure_level, imports_filter, min_revenue, max_revenue,
+            min_affected_cogs_pct, company_name, ticker, limit, sort_by, sort_desc
+        )
+        results = [data[i] for i in positions]
 
-        # Limit results
-        results = results[:limit]
+        # Columnar layout sends each field name once instead of once per company
+        if response_format == 'columnar':
+            companies = {
+                "columns": list(Company._fields),
+                "rows": [list(c) for c in results]
+            }
+        else:
+            companies = [c._asdict() for c in results]
 
         elapsed_time = time.time() - start_time
 
@@ -169,7 +498,7 @@ async def query_sp500_portfolio(
             "status": "success",
             "total_matches": total_matches,
             "returned_count": len(results),
-            "companies": results,
+            "companies": companies,
             "processing_time_ms": round(elapsed_time * 1000, 2)
         }
 
@@ -185,6 +514,22 @@ async def query_sp500_portfolio(
         raise
 
 
+@functools.lru_cache(maxsize=256)
+def _find_company(ticker: str, company_name: str) -> int:
+    """Row position for an exact ticker, else the first partial company-name match, else -1."""
+    if ticker:
+        idx = _by_ticker.get(ticker.upper())
+        if idx is not None:
+            return idx
+
+    if company_name:
+        hits = np.flatnonzero(np.char.find(_portfolio_cols['company_name_lower'], company_name.lower()) >= 0)
+        if len(hits):
+            return int(hits[0])
+
+    return -1
+
+
 @server.tool(
     name="get_company_details",
     title="Get Company Details",
@@ -222,24 +567,11 @@ async def get_company_details(
                 "processing_time_ms": round((time.time() - start_time) * 1000, 2)
             }
 
-        data = load_portfolio_data()
-        company = None
-
-        # Search by ticker first (exact match)
-        if ticker:
-            for c in data:
-                if c.get('ticker', '').upper() == ticker.upper():
-                    company = c
-                    break
+        data = await _ensure_portfolio_loaded()
 
-        # If not found, search by name (partial match)
-        if not company and company_name:
-            for c in data:
-                if company_name.lower() in c.get('company_name', '').lower():
-                    company = c
-                    break
-
-        if not company:
+        # Search by ticker first (exact match), then by name (partial match)
+        idx = _find_company(ticker, company_name)
+        if idx < 0:
             return {
                 "request_id": f"rq_{request_id}",
                 "status": "not_found",
@@ -247,30 +579,27 @@ async def get_company_details(
                 "processing_time_ms": round((time.time() - start_time) * 1000, 2)
             }
 
-        # Calculate additional metrics
-        revenue = float(company.get('revenue_usd', 0))
-        cogs = float(company.get('cogs_usd', 0))
-        affected_pct = float(company.get('affected_cogs_pct', 0))
-        affected_cogs_usd = cogs * affected_pct
-        potential_impact_usd = affected_cogs_usd * 0.25  # Assuming 25% tariff
+        company = data[idx]
+        cols = _portfolio_cols
+        affected_cogs_usd = float(cols['affected_cogs_usd'][idx])
 
         elapsed_time = time.time() - start_time
 
         result = {
             "request_id": f"rq_{request_id}",
             "status": "success",
-            "company": company,
+            "company": company._asdict(),
             "calculated_metrics": {
                 "affected_cogs_usd": affected_cogs_usd,
-                "potential_tariff_impact_usd": potential_impact_usd,
-                "revenue_to_cogs_ratio": revenue / cogs if cogs > 0 else 0,
-                "exposure_risk_score": affected_pct * (1 if company.get('imports_into_us') else 0)
+                "potential_tariff_impact_usd": affected_cogs_usd * 0.25,  # Assuming 25% tariff
+                "revenue_to_cogs_ratio": float(cols['revenue_to_cogs_ratio'][idx]),
+                "exposure_risk_score": float(cols['exposure_risk_score'][idx])
             },
             "processing_time_ms": round(elapsed_time * 1000, 2)
         }
 
         logger.info(f"✅ TOOL SUCCESS: get_company_details [ID: {request_id}] ({elapsed_time:.3f}s)")
-        logger.info(f"   └─ Found: {company.get('company_name')} ({company.get('ticker')})")
+        logger.info(f"   └─ Found: {company.company_name} ({company.ticker})")
 
         return result
 
@@ -281,6 +610,57 @@ async def get_company_details(
         raise
 
 
+@functools.lru_cache(maxsize=256)
+def _sector_analysis_impl(sector: str) -> Dict[str, Any]:
+    """Build the sector analysis response body (everything but the per-request fields)."""
+    data = _portfolio_rows
+
+    # Filter by sector if specified
+    positions = None
+    if sector:
+        positions = _by_sector.get(sector.lower())
+        if not positions:
+            return {
+                "status": "not_found",
+                "message": f"No companies found in sector '{sector}'"
+            }
+
+    # Aggregate every sector in one pass per metric, and pick each sector's top 5 in one grouped sort
+    agg = _sector_aggregates(positions)
+    top_exposed = _top_k_by_sector(5, positions)
+
+    # Build sector summaries
+    sector_summaries = []
+    for code, sec_name in enumerate(_sector_names):
+        if not agg['company_count'][code]:
+            continue
+
+        total_cogs = float(agg['total_cogs'][code])
+        total_affected_cogs = float(agg['total_affected_cogs'][code])
+        avg_exposure = (total_affected_cogs / total_cogs) if total_cogs > 0 else 0
+
+        sector_summaries.append({
+            'sector': sec_name,
+            'company_count': int(agg['company_count'][code]),
+            'total_investment_usd': float(agg['total_investment'][code]),
+            'total_revenue_usd': float(agg['total_revenue'][code]),
+            'total_cogs_usd': total_cogs,
+            'total_affected_cogs_usd': total_affected_cogs,
+            'average_exposure_pct': avg_exposure,
+            'importers_count': int(agg['importers_count'][code]),
+            'top_exposed_companies': [data[i]._asdict() for i in top_exposed[code]]
+        })
+
+    # Sort by total investment
+    sector_summaries = sorted(sector_summaries, key=operator.itemgetter('total_investment_usd'), reverse=True)
+
+    return {
+        "status": "success",
+        "sector_count": len(sector_summaries),
+        "sectors": sector_summaries
+    }
+
+
 @server.tool(
     name="get_sector_analysis",
     title="Get Sector Analysis",
@@ -309,82 +689,25 @@ async def get_sector_analysis(
     logger.info(f"   └─ Sector: {sector or 'All sectors'}")
 
     try:
-        data = load_portfolio_data()
-
-        # Filter by sector if specified
-        if sector:
-            data = [c for c in data if c.get('sector', '').lower() == sector.lower()]
-            if not data:
-                return {
-                    "request_id": f"rq_{request_id}",
-                    "status": "not_found",
-                    "message": f"No companies found in sector '{sector}'",
-                    "processing_time_ms": round((time.time() - start_time) * 1000, 2)
-                }
-
-        # Group by sector
-        sectors_data = {}
-        for company in data:
-            sec = company.get('sector', 'Unknown')
-            if sec not in sectors_data:
-                sectors_data[sec] = {
-                    'companies': [],
-                    'total_investment': 0,
-                    'total_revenue': 0,
-                    'total_cogs': 0,
-                    'total_affected_cogs': 0,
-                    'importers_count': 0
-                }
-
-            sectors_data[sec]['companies'].append(company)
-            sectors_data[sec]['total_investment'] += float(company.get('investment_usd', 0))
-            sectors_data[sec]['total_revenue'] += float(company.get('revenue_usd', 0))
-
-            cogs = float(company.get('cogs_usd', 0))
-            affected_pct = float(company.get('affected_cogs_pct', 0))
-            sectors_data[sec]['total_cogs'] += cogs
-            sectors_data[sec]['total_affected_cogs'] += cogs * affected_pct
-
-            if company.get('imports_into_us'):
-                sectors_data[sec]['importers_count'] += 1
-
-        # Build sector summaries
-        sector_summaries = []
-        for sec_name, sec_data in sectors_data.items():
-            total_cogs = sec_data['total_cogs']
-            avg_exposure = (sec_data['total_affected_cogs'] / total_cogs) if total_cogs > 0 else 0
-
-            sector_summaries.append({
-                'sector': sec_name,
-                'company_count': len(sec_data['companies']),
-                'total_investment_usd': sec_data['total_investment'],
-                'total_revenue_usd': sec_data['total_revenue'],
-                'total_cogs_usd': total_cogs,
-                'total_affected_cogs_usd': sec_data['total_affected_cogs'],
-                'average_exposure_pct': avg_exposure,
-                'importers_count': sec_data['importers_count'],
-                'top_exposed_companies': sorted(
-                    sec_data['companies'],
-                    key=lambda x: float(x.get('affected_cogs_pct', 0)),
-                    reverse=True
-                )[:5]
-            })
-
-        # Sort by total investment
-        sector_summaries = sorted(sector_summaries, key=lambda x: x['total_investment_usd'], reverse=True)
+        await _ensure_portfolio_loaded()
+        body = _sector_analysis_impl(sector)
+        if body['status'] != 'success':
+            return {
+                "request_id": f"rq_{request_id}",
+                **body,
+                "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+            }
 
         elapsed_time = time.time() - start_time
 
         result = {
             "request_id": f"rq_{request_id}",
-            "status": "success",
-            "sector_count": len(sector_summaries),
-            "sectors": sector_summaries,
+            **body,
             "processing_time_ms": round(elapsed_time * 1000, 2)
         }
 
         logger.info(f"✅ TOOL SUCCESS: get_sector_analysis [ID: {request_id}] ({elapsed_time:.3f}s)")
-        logger.info(f"   └─ Analyzed {len(sector_summaries)} sectors")
+        logger.info(f"   └─ Analyzed {body['sector_count']} sectors")
 
         return result
 
@@ -395,6 +718,68 @@ async def get_sector_analysis(
         raise
 
 
+@functools.lru_cache(maxsize=1)
+def _exposure_summary_impl() -> Dict[str, Any]:
+    """Build the exposure summary response body (everything but the per-request fields)."""
+    data = _portfolio_rows
+    cols = _portfolio_cols
+    affected_cogs = cols['affected_cogs_usd']
+
+    # Overall metrics, one vectorized reduction per column
+    total_companies = len(data)
+    total_investment = float(cols['investment_usd'].sum())
+    total_revenue = float(cols['revenue_usd'].sum())
+    total_cogs = float(cols['cogs_usd'].sum())
+    total_affected_cogs = float(affected_cogs.sum())
+    importers_count = int(np.count_nonzero(cols['imports_into_us']))
+
+    # Exposure level breakdown
+    exposure_breakdown = {
+        level: len(_by_exposure.get(level, []))
+        for level in ('high', 'medium', 'low', 'none')
+    }
+
+    # Sector exposure ranking
+    agg = _sector_aggregates()
+    sector_exposure_sorted = [
+        {
+            'sector': sec,
+            'exposure_pct': float(affected / sector_cogs) if sector_cogs > 0 else 0
+        }
+        for sec, sector_cogs, affected in zip(_sector_names, agg['total_cogs'], agg['total_affected_cogs'])
+    ]
+    sector_exposure_sorted = sorted(sector_exposure_sorted, key=operator.itemgetter('exposure_pct'), reverse=True)
+
+    # Top exposed companies
+    top_exposed = [data[i] for i in _top_k_positions(cols['affected_cogs_pct'], 10)]
+
+    return {
+        "status": "success",
+        "portfolio_overview": {
+            "total_companies": total_companies,
+            "total_investment_usd": total_investment,
+            "total_revenue_usd": total_revenue,
+            "total_cogs_usd": total_cogs,
+            "total_affected_cogs_usd": total_affected_cogs,
+            "overall_exposure_pct": total_affected_cogs / total_cogs if total_cogs > 0 else 0,
+            "companies_importing_from_china": importers_count
+        },
+        "exposure_level_breakdown": exposure_breakdown,
+        "top_exposed_companies": [
+            {
+                "ticker": c.ticker,
+                "company_name": c.company_name,
+                "sector": c.sector,
+                "exposure_level": c.exposure_level,
+                "affected_cogs_pct": c.affected_cogs_pct,
+                "imports_into_us": c.imports_into_us
+            }
+            for c in top_exposed
+        ],
+        "sector_exposure_ranking": sector_exposure_sorted
+    }
+
+
 @server.tool(
     name="get_exposure_summary",
     title="Get Tariff Exposure Summary",
@@ -422,86 +807,20 @@ async def get_exposure_summary(
     logger.info(f"🔧 TOOL CALLED: get_exposure_summary [ID: {request_id}]")
 
     try:
-        data = load_portfolio_data()
-
-        # Overall metrics
-        total_companies = len(data)
-        total_investment = sum(float(c.get('investment_usd', 0)) for c in data)
-        total_revenue = sum(float(c.get('revenue_usd', 0)) for c in data)
-        total_cogs = sum(float(c.get('cogs_usd', 0)) for c in data)
-
-        importers = [c for c in data if c.get('imports_into_us')]
-
-        # Calculate total affected COGS
-        total_affected_cogs = sum(
-            float(c.get('cogs_usd', 0)) * float(c.get('affected_cogs_pct', 0))
-            for c in data
-        )
-
-        # Exposure level breakdown
-        exposure_breakdown = {
-            'high': len([c for c in data if c.get('exposure_level', '').lower() == 'high']),
-            'medium': len([c for c in data if c.get('exposure_level', '').lower() == 'medium']),
-            'low': len([c for c in data if c.get('exposure_level', '').lower() == 'low']),
-            'none': len([c for c in data if c.get('exposure_level', '').lower() == 'none'])
-        }
-
-        # Sector exposure ranking
-        sectors = {}
-        for company in data:
-            sector = company.get('sector', 'Unknown')
-            if sector not in sectors:
-                sectors[sector] = {'total_cogs': 0, 'affected_cogs': 0}
-
-            cogs = float(company.get('cogs_usd', 0))
-            affected_pct = float(company.get('affected_cogs_pct', 0))
-            sectors[sector]['total_cogs'] += cogs
-            sectors[sector]['affected_cogs'] += cogs * affected_pct
-
-        sector_exposure_sorted = [
-            {
-                'sector': sec,
-                'exposure_pct': (data['affected_cogs'] / data['total_cogs']) if data['total_cogs'] > 0 else 0
-            }
-            for sec, data in sectors.items()
-        ]
-        sector_exposure_sorted = sorted(sector_exposure_sorted, key=lambda x: x['exposure_pct'], reverse=True)
-
-        # Top exposed companies
-        top_exposed = sorted(data, key=lambda x: float(x.get('affected_cogs_pct', 0)), reverse=True)[:10]
+        await _ensure_portfolio_loaded()
+        body = _exposure_summary_impl()
 
         elapsed_time = time.time() - start_time
 
         result = {
             "request_id": f"rq_{request_id}",
-            "status": "success",
-            "portfolio_overview": {
-                "total_companies": total_companies,
-                "total_investment_usd": total_investment,
-                "total_revenue_usd": total_revenue,
-                "total_cogs_usd": total_cogs,
-                "total_affected_cogs_usd": total_affected_cogs,
-                "overall_exposure_pct": total_affected_cogs / total_cogs if total_cogs > 0 else 0,
-                "companies_importing_from_china": len(importers)
-            },
-            "exposure_level_breakdown": exposure_breakdown,
-            "top_exposed_companies": [
-                {
-                    "ticker": c.get('ticker'),
-                    "company_name": c.get('company_name'),
-                    "sector": c.get('sector'),
-                    "exposure_level": c.get('exposure_level'),
-                    "affected_cogs_pct": c.get('affected_cogs_pct'),
-                    "imports_into_us": c.get('imports_into_us')
-                }
-                for c in top_exposed
-            ],
-            "sector_exposure_ranking": sector_exposure_sorted,
+            **body,
             "processing_time_ms": round(elapsed_time * 1000, 2)
         }
 
         logger.info(f"✅ TOOL SUCCESS: get_exposure_summary [ID: {request_id}] ({elapsed_time:.3f}s)")
-        logger.info(f"   └─ Portfolio: {len(data)} companies, {len(importers)} importing from China")
+        overview = body['portfolio_overview']
+        logger.info(f"   └─ Portfolio: {overview['total_companies']} companies, {overview['companies_importing_from_china']} importing from China")
 
         return result
 
@@ -530,9 +849,9 @@ def main():
         run_kwargs["port"] = args.port
         run_kwargs["host"] = args.host
 
-    # Pre-load data to verify CSV exists
+    # Load data in the background so the server is reachable while the CSV is parsed
     logger.info("🚀 Starting SP500 Portfolio Analysis MCP Server V2 (Azure-Compatible)...")
-    load_portfolio_data()
+    threading.Thread(target=load_portfolio_data, name="portfolio-loader", daemon=True).start()
 
     logger.info(f"📊 Server Name: {SERVER_NAME}")
     logger.info(f"📁 Data Source: {PORTFOLIO_CSV_PATH.absolute()}")
@@ -543,6 +862,15 @@ def main():
     logger.info(f"   - get_exposure_summary: Get comprehensive exposure summary")
     logger.info(f"✨ Schema: Azure AI Foundry compatible (no anyOf/oneOf/allOf)")
 
+    # uvloop is a drop-in faster event loop; fall back to the default asyncio loop without it
+    if USE_UVLOOP:
+        try:
+            import uvloop
+            uvloop.install()
+            logger.info(f"⚡ Event Loop: uvloop")
+        except ImportError:
+            logger.info(f"⚡ Event Loop: asyncio (uvloop not installed)")
+
     server.run(transport=transport, show_banner=show_banner, **run_kwargs)
 
 